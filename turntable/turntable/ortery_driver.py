@@ -1,43 +1,366 @@
 """Ortery turntable driver."""
+import asyncio
+import functools
+import logging
 import re
+import shlex
 import subprocess
-from collections import namedtuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+_logger = logging.getLogger(__name__)
 
 
 class SSHOptions():
-    """Options for SSH connection."""
+    """Options for SSH connection.
+
+    A ControlMaster connection is started lazily on the first command,
+    so the TCP and SSH handshake cost is only paid once; subsequent
+    commands are multiplexed over the existing connection.
+    """
+
+    CONTROL_PATH = '/tmp/ortery-%r@%h:%p'
+    CONTROL_PERSIST = '600'
 
     def __init__(self, user, host, password=None):
-        """Initialize."""
+        """Initialize.
+
+        The connection parameters are immutable per instance, so the
+        argv pieces every command shares are built once here instead
+        of on each call.
+        """
         self.user = user
         self.host = host
         self.password = password
-
-    def build_command(self, command):
-        """Build a command."""
-        password_prefix = ''
-        if self.password:
-            password_prefix = f"sshpass -p '{self.password}' "
-        return f'{password_prefix}ssh -o StrictHostKeyChecking=no -o ' \
-               f'LogLevel=QUIET {self.user}@{self.host} "{command}"'
+        self._master_up = False
+        self._owns_master = False
+        self._destination = f'{user}@{host}'
+        self._password_argv = ['sshpass', '-p', password] if password else []
+        self._control_argv = ['-o', f'ControlPath={self.CONTROL_PATH}',
+                              '-o', 'ControlMaster=auto',
+                              '-o', f'ControlPersist={self.CONTROL_PERSIST}']
+        self._base_argv = ['ssh'] + self._control_argv \
+            + ['-o', 'StrictHostKeyChecking=no',
+               '-o', 'LogLevel=QUIET',
+               self._destination]
+        self._base_argv_with_password = self._password_argv + self._base_argv
+        self.session = None
+
+    def _ensure_master(self):
+        """Start the shared master connection if none is running."""
+        if self._master_up:
+            return
+        check = subprocess.run(
+            ['ssh', '-O', 'check',
+             '-o', f'ControlPath={self.CONTROL_PATH}',
+             self._destination],
+            capture_output=True)
+        if check.returncode == 0:
+            self._master_up = True
+            return
+        start = subprocess.run(
+            self._password_argv + ['ssh', '-M', '-N', '-f']
+            + self._control_argv
+            + ['-o', 'StrictHostKeyChecking=no',
+               '-o', 'LogLevel=QUIET',
+               self._destination],
+            capture_output=True)
+        if start.returncode == 0:
+            self._master_up = True
+            self._owns_master = True
+
+    def build_argv(self, command):
+        """Build an argv list running the command over SSH."""
+        self._ensure_master()
+        # Once the master is up commands go over the shared connection
+        # and no longer need sshpass for authentication.
+        base = self._base_argv if self._master_up \
+            else self._base_argv_with_password
+        return base + [command]
+
+    def open_session(self):
+        """Open a persistent remote OTAD session, if the wrapper exists.
+
+        Returns True when the session could be started; rwo then sends
+        commands over its pipes instead of spawning a remote process
+        per call. Callers that never open a session keep the one-shot
+        behavior.
+        """
+        session = OTADSession(self)
+        if session.open():
+            self.session = session
+            return True
+        return False
+
+    def close(self):
+        """Stop the master connection, if this instance started one."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if not self._owns_master:
+            return
+        subprocess.run(
+            ['ssh', '-O', 'exit',
+             '-o', f'ControlPath={self.CONTROL_PATH}',
+             self._destination],
+            capture_output=True)
+        self._master_up = False
+        self._owns_master = False
+
+    def __eq__(self, other):
+        """Compare by connection parameters."""
+        if not isinstance(other, SSHOptions):
+            return NotImplemented
+        return (self.user, self.host, self.password) == \
+            (other.user, other.host, other.password)
+
+    def __hash__(self):
+        """Hash by connection parameters, so caches can key on them."""
+        return hash((self.user, self.host, self.password))
+
+    def __enter__(self):
+        """Enter a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the master connection on context exit."""
+        self.close()
+
+    def __del__(self):
+        """Close the master connection on garbage collection."""
+        self.close()
+
+
+class OTADSession():
+    """Long-lived remote OTAD wrapper session over one SSH process.
+
+    Talks to an otad_repl.exe wrapper on the remote host, which reads
+    commands from stdin and answers on stdout, ending each reply with
+    a sentinel line. This removes the remote fork+exec and OTAD
+    startup cost from every call. Access is serialized with a lock,
+    since the pipes carry one conversation at a time.
+    """
+
+    REPL_COMMAND = 'otad_repl.exe'
+    SENTINEL = b'===END==='
+
+    def __init__(self, ssh_opt):
+        """Initialize."""
+        self.ssh_opt = ssh_opt
+        self._lock = threading.Lock()
+        self._proc = None
+
+    def open(self):
+        """Start the remote wrapper process.
+
+        Returns False when the process could not be spawned; a wrapper
+        that turns out to be absent on the remote host is detected on
+        the first run call instead.
+        """
+        argv = self.ssh_opt.build_argv(self.REPL_COMMAND)
+        try:
+            self._proc = subprocess.Popen(argv,
+                                          stdin=subprocess.PIPE,
+                                          stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL)
+        except OSError:
+            self._proc = None
+            return False
+        return True
+
+    def run(self, command, debug=False):
+        """Run one command over the session.
+
+        Returns the raw output bytes, or None once the session is no
+        longer usable so the caller can fall back to one-shot mode.
+        """
+        if isinstance(command, list):
+            command = ' '.join(command)
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                return None
+            _logger.debug('session command: %s', command)
+            try:
+                self._proc.stdin.write(command.encode('utf-8') + b'\n')
+                self._proc.stdin.flush()
+            except OSError:
+                self.close()
+                return None
+            chunks = []
+            while True:
+                line = self._proc.stdout.readline()
+                if line == b'':
+                    # The remote wrapper went away mid-reply.
+                    self.close()
+                    return None
+                if line.strip() == self.SENTINEL:
+                    break
+                chunks.append(line)
+        output = b''.join(chunks)
+        _logger.debug('session output: %r', output)
+        return output
+
+    def close(self):
+        """Stop the wrapper process."""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._proc.terminate()
+        self._proc.wait()
+        self._proc = None
+
+
+def _build_argv(command, ssh_opt):
+    """Build the argv list executing a driver command."""
+    if ssh_opt:
+        if isinstance(command, list):
+            command = ' '.join(command)
+        return ssh_opt.build_argv(command)
+    if isinstance(command, list):
+        return command
+    return shlex.split(command)
 
 
 def rwo(command, debug=False, ssh_opt=None):
-    """Wrap subprocess.run to always capture output."""
-    if ssh_opt:
-        command = ssh_opt.build_command(command)
-    if debug:
-        print(command)
-    proc = subprocess.run(command, capture_output=True, shell=True)
-    output = proc.stdout.decode('utf-8')
-    if debug:
-        print(repr(output))
-    return output
+    """Wrap subprocess.run to always capture output.
+
+    The command may be a string or an argv list. Over SSH it is passed
+    as a single remote command; locally a string is split with shlex,
+    so no intermediate shell is spawned either way. When a persistent
+    session is open on ssh_opt the command goes over its pipes and no
+    process is spawned at all.
+
+    Diagnostics go to the module logger at DEBUG level, so formatting
+    is skipped entirely unless that level is enabled; the debug flag
+    is kept for API compatibility.
+    """
+    if ssh_opt is not None and ssh_opt.session is not None:
+        output = ssh_opt.session.run(command, debug)
+        if output is not None:
+            return output
+    argv = _build_argv(command, ssh_opt)
+    _logger.debug('command: %s', argv)
+    proc = subprocess.run(argv, capture_output=True)
+    _logger.debug('output: %r', proc.stdout)
+    return proc.stdout
+
+
+def rwo_first_line(command, debug=False, ssh_opt=None):
+    """Run a command but only read the first line of its output.
+
+    For replies where only the leading token matters this returns as
+    soon as the first line arrives and terminates the process, so the
+    captured output stays bounded and the caller does not wait for a
+    chatty remote process to flush the rest.
+    """
+    if ssh_opt is not None and ssh_opt.session is not None:
+        output = ssh_opt.session.run(command, debug)
+        if output is not None:
+            head, sep, _ = output.partition(b'\n')
+            return head + sep
+    argv = _build_argv(command, ssh_opt)
+    _logger.debug('command: %s', argv)
+    proc = subprocess.Popen(argv,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    line = proc.stdout.readline()
+    proc.terminate()
+    proc.wait()
+    _logger.debug('output: %r', line)
+    return line
+
+
+async def rwo_async(command, debug=False, ssh_opt=None):
+    """Asynchronous counterpart of rwo.
+
+    Uses asyncio subprocesses, so several driver calls can have their
+    SSH sessions in flight at the same time instead of serializing on
+    one blocking subprocess.run. When a persistent session is open on
+    ssh_opt its blocking pipe I/O runs in the default executor.
+    """
+    if ssh_opt is not None and ssh_opt.session is not None:
+        loop = asyncio.get_running_loop()
+        output = await loop.run_in_executor(
+            None, functools.partial(ssh_opt.session.run, command, debug))
+        if output is not None:
+            return output
+    argv = _build_argv(command, ssh_opt)
+    _logger.debug('command: %s', argv)
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE)
+    stdout, _ = await proc.communicate()
+    _logger.debug('output: %r', stdout)
+    return stdout
+
+
+# Output patterns, compiled once so the hot path skips the re cache.
+# The patterns are bytes, since rwo returns the raw ASCII protocol
+# output without decoding it.
+_DEV_COUNT_RE = re.compile(rb'^([0-9]+)\r\n$')
+_DEV_INFO_RE = re.compile(
+    rb'^Product Name : ([A-Za-z0-9 ]+)\r\nDevice ID : ([0-9]+)\r\n')
+_LEAD_INT_RE = re.compile(rb'^([0-9]+)')
+_ERR_RE = re.compile(rb'error code : (0x[0-9a-f]+)\)')
+
+BATCH_SEPARATOR = '__OTAD_SEP__'
+
+
+def rwo_batch(commands, debug=False, ssh_opt=None):
+    """Run several commands in one subprocess invocation.
+
+    The commands are joined into a single shell command separated by
+    echoed markers, so that over SSH all of them share one session
+    instead of paying a full handshake per command. Returns the output
+    of each command, in order.
+    """
+    if ssh_opt is None:
+        # Without SSH there is no session cost to amortize; just run
+        # the commands one by one.
+        return [rwo(command, debug) for command in commands]
+    joined = f'; echo {BATCH_SEPARATOR}; '.join(commands)
+    output = rwo(joined, debug, ssh_opt)
+    parts = output.split(BATCH_SEPARATOR.encode('ascii'))
+    # Each part after the first starts with the newline printed by echo.
+    return [parts[0]] + [part[1:] if part.startswith(b'\n') else part
+                         for part in parts[1:]]
+
+
+def _raise_for_error(output, exceptions):
+    """Raise the exception mapped to the error code in the output.
+
+    exceptions maps error codes such as '0x0040001' to a tuple of
+    exception class and constructor arguments. Outputs that do not
+    report an error code are left for the caller to parse.
+    """
+    m = _ERR_RE.search(output)
+    if m is None:
+        return
+    entry = exceptions.get(m.group(1))
+    if entry is not None:
+        exception, args = entry
+        raise exception(*args)
+
+
+def _check_int(name, value, lo=None, hi=None):
+    """Check that a value is an int, optionally within bounds."""
+    if type(value) is not int:
+        raise ValueError(f'{name} needs to be an int')
+    if lo is not None and (value < lo or value > hi):
+        raise ValueError(f'The range for {name} is from {lo} to {hi}')
 
 
 class UnexpectedOutputException(Exception):
     """Raised when the output is not as expected."""
 
+    __slots__ = ()
+
     def __init__(self, command, output, m):
         """Initialize."""
         Exception.__init__(
@@ -46,19 +369,33 @@ class UnexpectedOutputException(Exception):
             f'Matches: {m}\nCommand: {command}\nOutput: {output}')
 
 
+def _parse_device_count(command, output):
+    """Parse the output of an OTADCommand.exe get_device_count call."""
+    m = _DEV_COUNT_RE.search(output)
+    if m is None:
+        raise UnexpectedOutputException(command, output, m)
+    return int(m.group(1))
+
+
 def get_device_count(debug=False, ssh_opt=None):
     """Get the number of devices connected to this PC."""
     command = 'OTADCommand.exe get_device_count'
-    output = rwo(command, debug, ssh_opt)
-    m = re.search('^([0-9]+)\\r\\n$', output)
-    if m is None or len(m.groups()) < 2:
-        raise UnexpectedOutputException(command, output, m)
-    return int(m.group(1))
+    return _parse_device_count(command,
+                               rwo_first_line(command, debug, ssh_opt))
+
+
+async def get_device_count_async(debug=False, ssh_opt=None):
+    """Get the number of devices connected to this PC."""
+    command = 'OTADCommand.exe get_device_count'
+    return _parse_device_count(command,
+                               await rwo_async(command, debug, ssh_opt))
 
 
 class InvalidIdException(Exception):
     """Exception thrown when an invalid ID was passed, or device is offline."""
 
+    __slots__ = ('device_i',)
+
     def __init__(self, device_i):
         """Initialize."""
         Exception.__init__(self)
@@ -74,22 +411,62 @@ class DeviceInfo():
         self.device_i = device_i
 
 
+def _parse_device_info(command, device_i, output):
+    """Parse the output of an OTADCommand.exe get_device_info call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,))})
+    m = _DEV_INFO_RE.search(output)
+    if m is None:
+        raise UnexpectedOutputException(command, output, m)
+    return DeviceInfo(m.group(1).decode('utf-8'),
+                      int(m.group(2)))
+
+
+@functools.lru_cache(maxsize=32)
 def get_device_info(device_i, debug=False, ssh_opt=None):
+    """Get the device information.
+
+    The information is static per device, so results are memoized and
+    repeated queries skip the round-trip. Failed lookups are not
+    cached, since lru_cache does not store raised exceptions.
+    """
+    command = f'OTADCommand.exe get_device_info {device_i}'
+    return _parse_device_info(command, device_i,
+                              rwo(command, debug, ssh_opt))
+
+
+async def get_device_info_async(device_i, debug=False, ssh_opt=None):
     """Get the device information."""
     command = f'OTADCommand.exe get_device_info {device_i}'
-    output = rwo(command, debug, ssh_opt)
-    e = 'get_device_info :  command exec fail ( error code : 0x0040001)\r\n'
-    if output == e:
-        raise InvalidIdException(device_i)
-
-    s = '^Product Name : ([A-Za-z0-9 ]+)\\r\\nDevice ID : ([0-9]+)\\r\\n'
-    m = re.search(s, output)
-    if m is None or len(m.groups()) < 3:
-        raise UnexpectedOutputException(command, output, m)
-    return DeviceInfo(m.group(1), m.group(2))
+    return _parse_device_info(command, device_i,
+                              await rwo_async(command, debug, ssh_opt))
+
+
+def get_all_device_infos(device_count, debug=False, ssh_opt=None):
+    """Get the information of all connected devices concurrently.
+
+    Fires one get_device_info per device from a thread pool; with the
+    shared master connection each request is little more than a pipe
+    write and read, so enumerating N devices takes about one
+    round-trip instead of N.
+    """
+    if device_count <= 0:
+        return []
+    with ThreadPoolExecutor(max_workers=min(device_count, 16)) as executor:
+        return list(executor.map(
+            lambda device_i: get_device_info(device_i, debug, ssh_opt),
+            range(device_count)))
+
+
+@dataclass(frozen=True, slots=True)
+class Command():
+    """Description of a command supported by a device."""
+
+    name: str
+    value: int
+    description: str
 
 
-Command = namedtuple('Command', 'name value description')
 command_dict = {
     12801: Command('otadDEVICE_COMMAND_CABLERLEASE_OFF',
                    12801,
@@ -118,20 +495,44 @@ class UnknownCommand():
     pass
 
 
+_UNKNOWN_COMMAND = UnknownCommand()
+
+
+def _parse_command_desc(device_i, output):
+    """Parse the output of an OTADCommand.exe get_command_desc call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,))})
+    return [command_dict.get(int(line), _UNKNOWN_COMMAND)
+            for line in output.split(b'\r\n') if line.isdigit()]
+
+
+@functools.lru_cache(maxsize=32)
 def get_command_desc(device_i, debug=False, ssh_opt=None):
-    """Get a list of commands supported by the device."""
+    """Get a list of commands supported by the device.
+
+    The list is static per device, so results are memoized.
+    """
     cmd = f'OTADCommand.exe get_command_desc {device_i}'
     output = rwo(cmd, debug, ssh_opt)
-    e = 'get_command_desc :  command exec fail ( error code : 0x0040001)\r\n'
-    if output == e:
-        raise InvalidIdException(device_i)
+    return _parse_command_desc(device_i, output)
+
+
+async def get_command_desc_async(device_i, debug=False, ssh_opt=None):
+    """Get a list of commands supported by the device."""
+    cmd = f'OTADCommand.exe get_command_desc {device_i}'
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_command_desc(device_i, output)
 
-    command_ids = re.findall('([0-9]+)\r\n', output)
-    return [command_dict.get(int(command_id), UnknownCommand())
-            for command_id in command_ids]
+
+@dataclass(frozen=True, slots=True)
+class Property():
+    """Description of a property exposed by a device."""
+
+    name: str
+    value: int
+    description: str
 
 
-Property = namedtuple('Property', 'name value description')
 property_dict = {
     16641: Property('otadDEVICE_PROPERTY_TURNTABLE_STATE',
                     16641,
@@ -148,22 +549,53 @@ class UnknownProperty():
     pass
 
 
+_UNKNOWN_PROPERTY = UnknownProperty()
+
+
+def _parse_property_desc(device_i, output):
+    """Parse the output of an OTADCommand.exe get_property_desc call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,))})
+    return [property_dict.get(int(line), _UNKNOWN_PROPERTY)
+            for line in output.split(b'\r\n') if line.isdigit()]
+
+
+@functools.lru_cache(maxsize=32)
 def get_property_desc(device_i, debug=False, ssh_opt=None):
-    """Get a list of properties that can be read or set by the device."""
+    """Get a list of properties that can be read or set by the device.
+
+    The list is static per device, so results are memoized.
+    """
     cmd = f'OTADCommand.exe get_property_desc {device_i}'
     output = rwo(cmd, debug, ssh_opt)
-    e = 'get_property_desc :  command exec fail ( error code : 0x0040001)\r\n'
-    if output == e:
-        raise InvalidIdException(device_i)
+    return _parse_property_desc(device_i, output)
 
-    property_ids = re.findall('([0-9]+)\r\n', output)
-    return [property_dict.get(int(property_id), UnknownProperty())
-            for property_id in property_ids]
+
+async def get_property_desc_async(device_i, debug=False, ssh_opt=None):
+    """Get a list of properties that can be read or set by the device."""
+    cmd = f'OTADCommand.exe get_property_desc {device_i}'
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_property_desc(device_i, output)
+
+
+def get_command_and_property_desc(device_i, debug=False, ssh_opt=None):
+    """Get command and property descriptions in one round-trip.
+
+    Batches the two OTADCommand.exe calls into a single subprocess
+    invocation via rwo_batch, so over SSH only one session is opened.
+    """
+    commands = [f'OTADCommand.exe get_command_desc {device_i}',
+                f'OTADCommand.exe get_property_desc {device_i}']
+    command_output, property_output = rwo_batch(commands, debug, ssh_opt)
+    return (_parse_command_desc(device_i, command_output),
+            _parse_property_desc(device_i, property_output))
 
 
 class PropertyValueUnsupportedException(Exception):
     """Exception for when this property is not supported."""
 
+    __slots__ = ('device_i', 'property_id', 'data')
+
     def __init__(self, device_i, property_id, data):
         """Initialize."""
         Exception.__init__(self)
@@ -175,6 +607,8 @@ class PropertyValueUnsupportedException(Exception):
 class SetPropertiesValueUnsupportedException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'properties', 'data')
+
     def __init__(self, device_i, properties, data):
         """Initialize."""
         Exception.__init__(self)
@@ -186,6 +620,8 @@ class SetPropertiesValueUnsupportedException(Exception):
 class GetPropertyValueUnsupportedException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'property_id')
+
     def __init__(self, device_i, property_id):
         """Initialize."""
         Exception.__init__(self)
@@ -196,6 +632,8 @@ class GetPropertyValueUnsupportedException(Exception):
 class GetPropertyDeviceNotSupportPropertyException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'properties')
+
     def __init__(self, device_i, properties):
         """Initialize."""
         Exception.__init__(self)
@@ -203,34 +641,87 @@ class GetPropertyDeviceNotSupportPropertyException(Exception):
         self.properties = properties
 
 
+class PropertyReadTimeoutException(Exception):
+    """Exception for when a property read keeps returning no output."""
+
+    __slots__ = ('device_i', 'property_id')
+
+    def __init__(self, device_i, property_id):
+        """Initialize."""
+        Exception.__init__(self)
+        self.device_i = device_i
+        self.property_id = property_id
+
+
+MAX_PROPERTY_READ_RETRIES = 5
+
+
+def _property_read_delay(attempt):
+    """Get the backoff delay before retrying a property read."""
+    return min(0.05 * 2 ** attempt, 1.0)
+
+
+def _parse_property_data(cmd, device_i, property_id, output):
+    """Parse the output of an OTADCommand.exe get_property_data call.
+
+    Returns None when the output is empty, so the caller can retry.
+    """
+    if output == b'':
+        return None
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,)),
+        b'0x004000a': (GetPropertyValueUnsupportedException,
+                      (device_i, property_id)),
+        b'0x0040005': (GetPropertyDeviceNotSupportPropertyException,
+                      (device_i, property_id))})
+    m = _LEAD_INT_RE.search(output)
+    if m is None:
+        raise UnexpectedOutputException(cmd, output, m)
+    return int(m.group(1))
+
+
 def get_property_data(device_i, property_id, debug=False, ssh_opt=None):
-    """Get the data for a specified property."""
+    """Get the data for a specified property.
+
+    Empty responses are retried with exponential backoff instead of
+    re-issuing the command as fast as the OS allows; after
+    MAX_PROPERTY_READ_RETRIES attempts a PropertyReadTimeoutException
+    is raised.
+    """
     cmd = f'OTADCommand.exe get_property_data {device_i} {property_id}'
-    responded = False
-    while not responded:
-        output = rwo(cmd, True, ssh_opt)
-        if output == '':
-            continue
-        e = 'get_property_data :  command exec fail ( error code : 0x0040001)\r\n'  # noqa
-        if output == e:
-            raise InvalidIdException(device_i)
-        e = 'get_property_data :  command exec fail ( error code : 0x004000a)\r\n'  # noqa
-        if output == e:
-            raise GetPropertyValueUnsupportedException(device_i, property_id)
-        e = 'get_property_data :  command exec fail ( error code : 0x0040005)\r\n'  # noqa
-        if output == e:
-            raise GetPropertyDeviceNotSupportPropertyException(device_i,
-                                                               property_id)
-        m = re.search('^([0-9]+)', output)
-        if m is None or len(m.groups()) < 1:
-            raise UnexpectedOutputException(cmd, output, m)
-        responded = True
-    return int(m.group(1))
+    for attempt in range(MAX_PROPERTY_READ_RETRIES):
+        output = rwo_first_line(cmd, debug, ssh_opt)
+        data = _parse_property_data(cmd, device_i, property_id, output)
+        if data is not None:
+            return data
+        time.sleep(_property_read_delay(attempt))
+    raise PropertyReadTimeoutException(device_i, property_id)
+
+
+async def get_property_data_async(device_i, property_id,
+                                  debug=False, ssh_opt=None):
+    """Get the data for a specified property.
+
+    Empty responses are retried with exponential backoff instead of
+    re-issuing the command as fast as the OS allows; after
+    MAX_PROPERTY_READ_RETRIES attempts a PropertyReadTimeoutException
+    is raised.
+    """
+    cmd = f'OTADCommand.exe get_property_data {device_i} {property_id}'
+    for attempt in range(MAX_PROPERTY_READ_RETRIES):
+        output = await rwo_async(cmd, debug, ssh_opt)
+        data = _parse_property_data(cmd, device_i, property_id, output)
+        if data is not None:
+            return data
+        await asyncio.sleep(_property_read_delay(attempt))
+    raise PropertyReadTimeoutException(device_i, property_id)
 
 
 class SetPropertyValueUnsupportedException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'property_id', 'data')
+
     def __init__(self, device_i, property_id, data):
         """Initialize."""
         Exception.__init__(self)
@@ -242,6 +733,8 @@ class SetPropertyValueUnsupportedException(Exception):
 class SetPropertyDeviceNotSupportException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'properties', 'data')
+
     def __init__(self, device_i, properties, data):
         """Initialize."""
         Exception.__init__(self)
@@ -250,31 +743,48 @@ class SetPropertyDeviceNotSupportException(Exception):
         self.data = data
 
 
-def set_property_data(device_i, property_id, data, debug=False, ssh_opt=None):
-    """Set the data for a specified property."""
+def _parse_set_property_data(device_i, property_id, data, output):
+    """Parse the output of an OTADCommand.exe set_property_data call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,)),
+        b'0x004000a': (SetPropertyValueUnsupportedException,
+                      (device_i, property_id, data)),
+        b'0x0040005': (SetPropertyDeviceNotSupportException,
+                      (device_i, property_id, data))})
+    return True
+
+
+def _build_set_property_data_command(device_i, property_id, data):
+    """Validate the arguments and build the set_property_data command."""
     if device_i is None:
         raise ValueError('device_i')
     if property_id is None:
         raise ValueError('property_id')
     if data is None:
         raise ValueError('data')
-    cmd = f'OTADCommand.exe set_property_data {device_i} {property_id} {data}'
+    return f'OTADCommand.exe set_property_data {device_i} {property_id} {data}'
+
+
+def set_property_data(device_i, property_id, data, debug=False, ssh_opt=None):
+    """Set the data for a specified property."""
+    cmd = _build_set_property_data_command(device_i, property_id, data)
     output = rwo(cmd, debug, ssh_opt)
-    e = 'set_property_data :  command exec fail ( error code : 0x0040001)\r\n'
-    if output == e:
-        raise InvalidIdException(device_i)
-    e = 'set_property_data :  command exec fail ( error code : 0x004000a)\r\n'
-    if output == e:
-        raise SetPropertyValueUnsupportedException(device_i, property_id, data)
-    e = 'set_property_data :  command exec fail ( error code : 0x0040005)\r\n'
-    if output == e:
-        raise SetPropertyDeviceNotSupportException(device_i, property_id, data)
-    return True
+    return _parse_set_property_data(device_i, property_id, data, output)
+
+
+async def set_property_data_async(device_i, property_id, data,
+                                  debug=False, ssh_opt=None):
+    """Set the data for a specified property."""
+    cmd = _build_set_property_data_command(device_i, property_id, data)
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_set_property_data(device_i, property_id, data, output)
 
 
 class SetPropertyDeviceNotSupportPropertyException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'properties')
+
     def __init__(self, device_i, properties):
         """Initialize."""
         Exception.__init__(self)
@@ -282,37 +792,50 @@ class SetPropertyDeviceNotSupportPropertyException(Exception):
         self.properties = properties
 
 
-def set_properties_data(device_i, properties, data, debug=False, ssh_opt=None):
-    """Set properties on the device."""
-    if type(device_i) is not int:
-        raise ValueError('device_i needs to be an int')
+def _parse_set_properties_data(device_i, properties, data, output):
+    """Parse the output of an OTADCommand.exe set_properties_data call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,)),
+        b'0x004000a': (SetPropertiesValueUnsupportedException,
+                      (device_i, properties, data)),
+        b'0x0040005': (SetPropertyDeviceNotSupportPropertyException,
+                      (device_i, properties, data))})
+    return True
+
+
+def _build_set_properties_data_command(device_i, properties, data):
+    """Validate the arguments and build the set_properties_data command."""
+    _check_int('device_i', device_i)
     if type(properties) is not list:
         raise ValueError('device_i should be a list')
     if len(properties) == 0:
         raise ValueError('At least one property should be specified')
     if len(properties) > 20:
         raise ValueError('Maximum of 20 properties can be set at a time')
-    cmd_builder = f'OTADCommand.exe set_properties_data {device_i} {data}'
-    for prop in properties:
-        cmd_builder += f' {prop}'
-    output = rwo(cmd_builder, debug, ssh_opt)
-    e = 'set_properties_data :  command exec fail ( error code : 0x0040001)\r\n'  # noqa
-    if output == e:
-        raise InvalidIdException(device_i)
-    e = 'set_properties_data :  command exec fail ( error code : 0x004000a)\r\n'  # noqa
-    if output == e:
-        raise SetPropertiesValueUnsupportedException(
-            device_i, properties, data)
-    e = 'set_properties_data :  command exec fail ( error code : 0x0040005)\r\n'  # noqa
-    if output == e:
-        raise SetPropertyDeviceNotSupportPropertyException(
-            device_i, properties, data)
-    return True
+    return f'OTADCommand.exe set_properties_data {device_i} {data} ' \
+        + ' '.join(str(prop) for prop in properties)
+
+
+def set_properties_data(device_i, properties, data, debug=False, ssh_opt=None):
+    """Set properties on the device."""
+    cmd = _build_set_properties_data_command(device_i, properties, data)
+    output = rwo(cmd, debug, ssh_opt)
+    return _parse_set_properties_data(device_i, properties, data, output)
+
+
+async def set_properties_data_async(device_i, properties, data,
+                                    debug=False, ssh_opt=None):
+    """Set properties on the device."""
+    cmd = _build_set_properties_data_command(device_i, properties, data)
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_set_properties_data(device_i, properties, data, output)
 
 
 class CommandUnsupportedException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'command')
+
     def __init__(self, device_i, command):
         """Initialize."""
         Exception.__init__(self)
@@ -323,6 +846,8 @@ class CommandUnsupportedException(Exception):
 class CommandNotSupportedByDeviceException(Exception):
     """Exception for when setting this property is not supported."""
 
+    __slots__ = ('device_i', 'command')
+
     def __init__(self, device_i, command):
         """Initialize."""
         Exception.__init__(self)
@@ -330,24 +855,35 @@ class CommandNotSupportedByDeviceException(Exception):
         self.command = command
 
 
+def _parse_send_command(device_i, command_id, output):
+    """Parse the output of an OTADCommand.exe send_command call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,)),
+        b'0x004000a': (CommandUnsupportedException, (device_i, command_id)),
+        b'0x0040005': (CommandNotSupportedByDeviceException,
+                      (device_i, command_id))})
+    return True
+
+
+def _build_send_command_command(device_i, command_id):
+    """Validate the arguments and build the send_command command."""
+    _check_int('device_i', device_i)
+    _check_int('command_id', command_id)
+    return f'OTADCommand.exe send_command {device_i} {command_id}'
+
+
 def send_command(device_i, command_id, debug=False, ssh_opt=None):
     """Send command to the device."""
-    if type(device_i) is not int:
-        raise ValueError('device_i needs to be an int')
-    if type(command_id) is not int:
-        raise ValueError('command_id needs to be an int')
-    cmd = f'OTADCommand.exe send_command {device_i} {command_id}'
+    cmd = _build_send_command_command(device_i, command_id)
     output = rwo(cmd, debug, ssh_opt)
-    e = 'send_command :  command exec fail ( error code : 0x0040001)\r\n'
-    if output == e:
-        raise InvalidIdException(device_i)
-    e = 'send_command :  command exec fail ( error code : 0x004000a)\r\n'
-    if output == e:
-        raise CommandUnsupportedException(device_i, command_id)
-    e = 'send_command :  command exec fail ( error code : 0x0040005)\r\n'
-    if output == e:
-        raise CommandNotSupportedByDeviceException(device_i, command_id)
-    return True
+    return _parse_send_command(device_i, command_id, output)
+
+
+async def send_command_async(device_i, command_id, debug=False, ssh_opt=None):
+    """Send command to the device."""
+    cmd = _build_send_command_command(device_i, command_id)
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_send_command(device_i, command_id, output)
 
 
 SPEED_LOW = 0
@@ -358,19 +894,180 @@ DIRECTION_CLOCKWISE = 0
 DIRECTION_COUNTER_CLOCKWISE = 1
 
 
+def _parse_turntable(device_i, output):
+    """Parse the output of an OTADCommand.exe turntable call."""
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,))})
+    return True
+
+
+def _build_turntable_command(device_i, speed, direction, step):
+    """Validate the arguments and build the turntable command."""
+    _check_int('device_i', device_i)
+    _check_int('speed', speed, 0, 2)
+    _check_int('direction', direction, 0, 1)
+    _check_int('step', step, 0, 665535)
+    return f'OTADCommand.exe turntable {device_i} {speed} {direction} {step}'
+
+
 def turntable(device_i, speed, direction, step, debug=False, ssh_opt=None):
     """Turn."""
-    if type(device_i) is not int:
-        raise ValueError('device_i needs to be an int')
-    if speed < 0 or speed > 2:
-        raise ValueError('The range for speed is from 0 to 2')
-    if direction != 0 and direction != 1:
-        raise ValueError('The accepted values for direction are 0 and 1.')
-    if step < 0 or step > 665535:
-        raise ValueError('The range for step is from 0 to 665535')
-    cmd = f'OTADCommand.exe turntable {device_i} {speed} {direction} {step}'
+    cmd = _build_turntable_command(device_i, speed, direction, step)
     output = rwo(cmd, debug, ssh_opt)
-    e = 'turntable :  command exec fail ( error code : 0x0040001)\r\n'
-    if output == e:
-        raise InvalidIdException(device_i)
+    return _parse_turntable(device_i, output)
+
+
+async def turntable_async(device_i, speed, direction, step,
+                          debug=False, ssh_opt=None):
+    """Turn."""
+    cmd = _build_turntable_command(device_i, speed, direction, step)
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_turntable(device_i, output)
+
+
+@functools.lru_cache(maxsize=32)
+def get_total_steps(device_i, debug=False, ssh_opt=None):
+    """Get the total number of steps of the turntable.
+
+    The value is constant per device, so it is memoized and repeated
+    degree-to-step conversions skip the round-trip entirely.
+    """
+    return get_property_data(device_i, 16643, debug, ssh_opt)
+
+
+def _build_turntable_degrees_remote_command(device_i, speed, direction,
+                                            degrees):
+    """Validate the arguments and build the combined remote command.
+
+    The total-steps read and the degree-to-step conversion happen in
+    the remote shell, so the turn costs a single SSH round-trip.
+    """
+    _check_int('device_i', device_i)
+    _check_int('degrees', degrees)
+    _check_int('speed', speed, 0, 2)
+    _check_int('direction', direction, 0, 1)
+    return (f'STEPS=$(OTADCommand.exe get_property_data {device_i} 16643'
+            " | head -1 | tr -d '\\r'); "
+            'case "$STEPS" in ""|*[!0-9]*) echo "$STEPS";; '
+            f'*) OTADCommand.exe turntable {device_i} {speed} {direction} '
+            f'$(({degrees} * $STEPS / 360));; esac')
+
+
+def _parse_turntable_degrees(device_i, output):
+    """Parse the output of the combined remote degree-turn command.
+
+    A failed total-steps read is echoed through by the remote shell
+    instead of being fed into the arithmetic, so its error code ends
+    up here and raises like a direct get_property_data call would.
+    """
+    _raise_for_error(output, {
+        b'0x0040001': (InvalidIdException, (device_i,)),
+        b'0x004000a': (GetPropertyValueUnsupportedException,
+                      (device_i, 16643)),
+        b'0x0040005': (GetPropertyDeviceNotSupportPropertyException,
+                      (device_i, 16643))})
     return True
+
+
+def turntable_degrees(device_i, speed, direction, degrees,
+                      debug=False, ssh_opt=None):
+    """Turn by an angle in degrees.
+
+    Over SSH the total-steps read and the turn run as one remote
+    command, halving the round-trips of a degree-based move. Locally
+    it falls back to the cached total-steps read plus a turn.
+    """
+    if ssh_opt is None:
+        total_steps = get_total_steps(device_i, debug)
+        return turntable(device_i, speed, direction,
+                         int(degrees * (total_steps / 360)), debug)
+    cmd = _build_turntable_degrees_remote_command(device_i, speed,
+                                                  direction, degrees)
+    output = rwo(cmd, debug, ssh_opt)
+    return _parse_turntable_degrees(device_i, output)
+
+
+async def turntable_degrees_async(device_i, speed, direction, degrees,
+                                  debug=False, ssh_opt=None):
+    """Turn by an angle in degrees.
+
+    Over SSH the total-steps read and the turn run as one remote
+    command, halving the round-trips of a degree-based move. Locally
+    it falls back to the cached total-steps read plus a turn.
+    """
+    if ssh_opt is None:
+        total_steps = get_total_steps(device_i, debug)
+        return await turntable_async(device_i, speed, direction,
+                                     int(degrees * (total_steps / 360)),
+                                     debug)
+    cmd = _build_turntable_degrees_remote_command(device_i, speed,
+                                                  direction, degrees)
+    output = await rwo_async(cmd, debug, ssh_opt)
+    return _parse_turntable_degrees(device_i, output)
+
+
+_BULK_BUILDERS = {
+    'send_command': _build_send_command_command,
+    'set_property_data': _build_set_property_data_command,
+    'turntable': _build_turntable_command,
+    }
+_BULK_PARSERS = {
+    'send_command':
+        lambda args, output: _parse_send_command(args[0], args[1], output),
+    'set_property_data':
+        lambda args, output: _parse_set_property_data(args[0], args[1],
+                                                      args[2], output),
+    'turntable':
+        lambda args, output: _parse_turntable(args[0], output),
+    }
+_BULK_ERRORS = (InvalidIdException,
+                CommandUnsupportedException,
+                CommandNotSupportedByDeviceException,
+                SetPropertyValueUnsupportedException,
+                SetPropertyDeviceNotSupportException,
+                UnexpectedOutputException)
+
+
+def bulk_ops(ops, debug=False, ssh_opt=None):
+    """Run a sequence of driver operations in one round-trip.
+
+    ops is a list of (op, args) pairs, where op is one of
+    'send_command', 'set_property_data' or 'turntable' and args holds
+    the positional arguments of the matching driver function. All
+    commands are sent through rwo_batch, so over SSH a K-op sequence
+    such as focus-snap-turn costs one session instead of K. Returns
+    one bool per operation; unknown ops and invalid arguments fail
+    without being sent.
+    """
+    commands = []
+    runnable = []
+    for op, args in ops:
+        builder = _BULK_BUILDERS.get(op)
+        if builder is None:
+            runnable.append(False)
+            continue
+        try:
+            commands.append(builder(*args))
+        except (ValueError, TypeError):
+            runnable.append(False)
+            continue
+        runnable.append(True)
+    outputs = rwo_batch(commands, debug, ssh_opt) if commands else []
+    successes = []
+    output_i = 0
+    for (op, args), ok in zip(ops, runnable):
+        if not ok:
+            successes.append(False)
+            continue
+        if output_i >= len(outputs):
+            # The batch came back short (e.g. the SSH call itself
+            # failed), so the remaining ops cannot be confirmed.
+            successes.append(False)
+            continue
+        output = outputs[output_i]
+        output_i += 1
+        try:
+            successes.append(_BULK_PARSERS[op](args, output))
+        except _BULK_ERRORS:
+            successes.append(False)
+    return successes
@@ -1,13 +1,31 @@
+import asyncio
+import logging
+import threading
 import time
 
 import rclpy
 import turntable.ortery_driver as driver
-from turntable.ortery_driver import SSHOptions
+from turntable.ortery_driver import SSHOptions, \
+                                    InvalidIdException, \
+                                    PropertyReadTimeoutException, \
+                                    UnexpectedOutputException, \
+                                    CommandUnsupportedException, \
+                                    CommandNotSupportedByDeviceException, \
+                                    GetPropertyValueUnsupportedException, \
+                                    GetPropertyDeviceNotSupportPropertyException, \
+                                    SetPropertyValueUnsupportedException, \
+                                    SetPropertyDeviceNotSupportException, \
+                                    SetPropertiesValueUnsupportedException, \
+                                    SetPropertyDeviceNotSupportPropertyException
 from rclpy.action import ActionServer
+from rclpy.callback_groups import ReentrantCallbackGroup
+from rclpy.executors import MultiThreadedExecutor
 from rclpy.node import Node
 from turntable_interfaces.msg import CommandDesc, \
                                      PropertyDesc
-from turntable_interfaces.srv import GetCommandDesc, \
+from turntable_interfaces.srv import BulkDriverOps, \
+                                     GetAllDeviceInfos, \
+                                     GetCommandDesc, \
                                      GetDeviceCount, \
                                      GetDeviceInfo, \
                                      GetPropertyDesc, \
@@ -38,57 +56,97 @@ def map_ortery_property_desc_to_ros_type(opd):
 class TurntableNode(Node):
     def __init__(self):
         super().__init__("turntable_node")
+        # Driver calls run on a dedicated asyncio loop so that several
+        # in-flight SSH/OTAD subprocesses can overlap instead of
+        # serializing on the executor thread. The reentrant callback
+        # group lets the executor process callbacks concurrently.
+        self._driver_loop = asyncio.new_event_loop()
+        self._driver_loop_thread = threading.Thread(
+            target=self._driver_loop.run_forever, daemon=True)
+        self._driver_loop_thread.start()
+        # One SSHOptions per connection parameters, kept for the
+        # lifetime of the node: dropping the instance that started the
+        # ControlMaster would tear the shared connection down again
+        # after every callback.
+        self._ssh_options = None
+        self._callback_group = ReentrantCallbackGroup()
         self.get_device_count = self.create_service(
             GetDeviceCount,
             "get_device_count",
-            self.get_device_count_callback)
+            self.get_device_count_callback,
+            callback_group=self._callback_group)
         self.get_device_info =  self.create_service(
             GetDeviceInfo,
             "get_device_info",
-            self.get_device_info_callback)
+            self.get_device_info_callback,
+            callback_group=self._callback_group)
+        self.get_all_device_infos = self.create_service(
+            GetAllDeviceInfos,
+            "get_all_device_infos",
+            self.get_all_device_infos_callback,
+            callback_group=self._callback_group)
         self.get_command_desc =  self.create_service(
             GetCommandDesc,
             "get_command_desc",
-            self.get_command_desc_callback)
+            self.get_command_desc_callback,
+            callback_group=self._callback_group)
         self.get_property_desc = self.create_service(
             GetPropertyDesc,
             "get_property_desc",
-            self.get_property_desc_callback)
+            self.get_property_desc_callback,
+            callback_group=self._callback_group)
         self.get_property_data = self.create_service(
             GetPropertyData,
             "get_property_data",
-            self.get_property_data_callback)
+            self.get_property_data_callback,
+            callback_group=self._callback_group)
         self.set_property_data = self.create_service(
             SetPropertyData,
             "set_property_data",
-            self.set_property_data_callback)
+            self.set_property_data_callback,
+            callback_group=self._callback_group)
         self.set_properties_data = self.create_service(
             SetPropertiesData,
             "set_properties_data",
-            self.set_properties_data_callback)
+            self.set_properties_data_callback,
+            callback_group=self._callback_group)
         self.send_command = self.create_service(
             SendCommand,
             "send_command",
-            self.send_command_callback)
+            self.send_command_callback,
+            callback_group=self._callback_group)
         self.turntable = ActionServer(
             self,
             Turntable,
             "turntable",
-            self.turntable_callback)
+            self.turntable_callback,
+            callback_group=self._callback_group)
         self.turntable_degrees = ActionServer(
             self,
             TurntableDegrees,
             "turntable_degrees",
-            self.turntable_degrees_callback)
+            self.turntable_degrees_callback,
+            callback_group=self._callback_group)
         self.turntable_stop = self.create_service(
             TurntableStop,
             "turntable_stop",
-            self.turntable_stop_callback)
+            self.turntable_stop_callback,
+            callback_group=self._callback_group)
+        self.bulk_driver_ops = self.create_service(
+            BulkDriverOps,
+            "bulk_driver_ops",
+            self.bulk_driver_ops_callback,
+            callback_group=self._callback_group)
         self.declare_parameter("debug", False)
         self.declare_parameter("use_ssh", False)
         self.declare_parameter("ssh_user", "")
         self.declare_parameter("ssh_host", "")
         self.declare_parameter("ssh_password", "")
+        if self.get_debug_value():
+            driver_logger = logging.getLogger("turntable.ortery_driver")
+            driver_logger.setLevel(logging.DEBUG)
+            if not driver_logger.handlers:
+                driver_logger.addHandler(logging.StreamHandler())
 
     def get_debug_value(self):
         return self.get_parameter("debug").get_parameter_value().bool_value
@@ -98,16 +156,27 @@ class TurntableNode(Node):
             user = str(self.get_parameter("ssh_user").value)
             host = str(self.get_parameter("ssh_host").value)
             password = str(self.get_parameter("ssh_password").value)
-            return SSHOptions(user, host, password if password != "" else None)
+            ssh_options = SSHOptions(user, host,
+                                     password if password != "" else None)
+            if self._ssh_options != ssh_options:
+                if self._ssh_options is not None:
+                    self._ssh_options.close()
+                self._ssh_options = ssh_options
+            return self._ssh_options
         return None
-        
+
+    def run_driver(self, coro):
+        return asyncio.run_coroutine_threadsafe(
+            coro, self._driver_loop).result()
+
     def get_device_count_callback(self, request, response):
-        response.count = driver.get_device_count(self.get_debug_value(), self.get_ssh_options())
+        response.count = self.run_driver(driver.get_device_count_async(
+            self.get_debug_value(), self.get_ssh_options()))
         return response
 
     def get_device_info_callback(self, request, response):
         try:
-            device_info = driver.get_device_info(request.id,
+            device_info = driver.get_device_info(request.device_i,
                                                  self.get_debug_value(),
                                                  self.get_ssh_options())
             response.product_name = device_info.product_name
@@ -118,6 +187,23 @@ class TurntableNode(Node):
 
         return response
 
+    def get_all_device_infos_callback(self, request, response):
+        try:
+            count = self.run_driver(driver.get_device_count_async(
+                self.get_debug_value(), self.get_ssh_options()))
+            device_infos = driver.get_all_device_infos(
+                count,
+                self.get_debug_value(),
+                self.get_ssh_options())
+            response.product_names = [device_info.product_name
+                                      for device_info in device_infos]
+            response.device_is = [device_info.device_i
+                                  for device_info in device_infos]
+            response.success = True
+        except (InvalidIdException, UnexpectedOutputException):
+            response.success = False
+        return response
+
     def get_command_desc_callback(self, request, response):
         try:
             command_descs = driver.get_command_desc(request.device_i,
@@ -146,60 +232,87 @@ class TurntableNode(Node):
 
     def get_property_data_callback(self, request, response):
         try:
-            response.data = driver.get_property_data(request.device_i,
-                                                     request.property_id,
-                                                     self.get_debug_value(),
-                                                     self.get_ssh_options())
+            response.data = self.run_driver(driver.get_property_data_async(
+                request.device_i,
+                request.property_id,
+                self.get_debug_value(),
+                self.get_ssh_options()))
             response.success = True
-        except InvalidIdException:
+        except (InvalidIdException,
+                GetPropertyValueUnsupportedException,
+                GetPropertyDeviceNotSupportPropertyException,
+                PropertyReadTimeoutException,
+                UnexpectedOutputException):
             response.success = False
         return response
 
     def set_property_data_callback(self, request, response):
         try:
-            result.success = driver.set_property_data(request.device_i,
-                                                      request.property_id,
-                                                      request.data,
-                                                      self.get_debug_value(),
-                                                      self.get_ssh_options())
-        except:
+            response.success = self.run_driver(driver.set_property_data_async(
+                request.device_i,
+                request.property_id,
+                request.data,
+                self.get_debug_value(),
+                self.get_ssh_options()))
+        except (InvalidIdException,
+                SetPropertyValueUnsupportedException,
+                SetPropertyDeviceNotSupportException,
+                ValueError):
             response.success = False
         return response
 
     def set_properties_data_callback(self, request, response):
         try:
-            response.success = driver.set_properties_data(request.device_i,
-                                                          request.properties,
-                                                          request.data,
-                                                          self.get_debug_value(),
-                                                          self.get_ssh_options())
-        except:
+            response.success = self.run_driver(
+                driver.set_properties_data_async(
+                    request.device_i,
+                    request.properties,
+                    request.data,
+                    self.get_debug_value(),
+                    self.get_ssh_options()))
+        except (InvalidIdException,
+                SetPropertiesValueUnsupportedException,
+                SetPropertyDeviceNotSupportPropertyException,
+                ValueError):
             response.success = False
         return response
 
     def send_command_callback(self, request, response):
         try:
-            response.success = driver.send_command(request.device_i,
-                                                   request.command,
-                                                   self.get_debug_value(),
-                                                   self.get_ssh_options())
-        except:
+            response.success = self.run_driver(driver.send_command_async(
+                request.device_i,
+                request.command,
+                self.get_debug_value(),
+                self.get_ssh_options()))
+        except (InvalidIdException,
+                CommandUnsupportedException,
+                CommandNotSupportedByDeviceException,
+                ValueError):
             response.success = False
         return response
 
+    def bulk_driver_ops_callback(self, request, response):
+        ops = [(op.op, tuple(int(arg) for arg in op.args))
+               for op in request.ops]
+        response.successes = driver.bulk_ops(ops,
+                                             self.get_debug_value(),
+                                             self.get_ssh_options())
+        return response
+
     def turntable_callback(self, goal_handle):
         try:
-            driver.turntable(goal_handle.request.device_i,
-                             goal_handle.request.speed,
-                             goal_handle.request.direction,
-                             goal_handle.request.step,
-                             self.get_debug_value(),
-                             self.get_ssh_options())
-            while driver.get_property_data(
+            self.run_driver(driver.turntable_async(
+                goal_handle.request.device_i,
+                goal_handle.request.speed,
+                goal_handle.request.direction,
+                goal_handle.request.step,
+                self.get_debug_value(),
+                self.get_ssh_options()))
+            while self.run_driver(driver.get_property_data_async(
                     goal_handle.request.device_i,
                     16641,
                     self.get_debug_value(),
-                    self.get_ssh_options()) == 8210:
+                    self.get_ssh_options())) == 8210:
                 feedback_msg = Turntable.Feedback()
                 feedback_msg.state = "Turning"
                 goal_handle.publish_feedback(feedback_msg)
@@ -208,7 +321,12 @@ class TurntableNode(Node):
             feedback_msg = Turntable.Feedback()
             feedback_msg.state = "Finished"
             goal_handle.publish_feedback(feedback_msg)
-        except:
+        except (InvalidIdException,
+                GetPropertyValueUnsupportedException,
+                GetPropertyDeviceNotSupportPropertyException,
+                PropertyReadTimeoutException,
+                UnexpectedOutputException,
+                ValueError):
             success = False
         goal_handle.succeed()
         result = Turntable.Result()
@@ -217,21 +335,18 @@ class TurntableNode(Node):
 
     def turntable_degrees_callback(self, goal_handle):
         try:
-            total_steps = driver.get_property_data(goal_handle.request.device_i,
-                                                   16643,
-                                                   self.get_debug_value(),
-                                                   self.get_ssh_options())
-            driver.turntable(goal_handle.request.device_i,
-                             goal_handle.request.speed,
-                             goal_handle.request.direction,
-                             int(goal_handle.request.degrees * (total_steps/360)),
-                             self.get_debug_value(),
-                             self.get_ssh_options())
-            while driver.get_property_data(
+            self.run_driver(driver.turntable_degrees_async(
+                goal_handle.request.device_i,
+                goal_handle.request.speed,
+                goal_handle.request.direction,
+                goal_handle.request.degrees,
+                self.get_debug_value(),
+                self.get_ssh_options()))
+            while self.run_driver(driver.get_property_data_async(
                     goal_handle.request.device_i,
                     16641,
                     self.get_debug_value(),
-                    self.get_ssh_options()) == 8210:
+                    self.get_ssh_options())) == 8210:
                 feedback_msg = TurntableDegrees.Feedback()
                 feedback_msg.state = "Turning"
                 goal_handle.publish_feedback(feedback_msg)
@@ -250,11 +365,15 @@ class TurntableNode(Node):
 
     def turntable_stop_callback(self, request, response):
         try:
-            response.success = driver.send_command(request.device_i,
-                                                   13057,
-                                                   self.get_debug_value(),
-                                                   self.get_ssh_options())
-        except:
+            response.success = self.run_driver(driver.send_command_async(
+                request.device_i,
+                13057,
+                self.get_debug_value(),
+                self.get_ssh_options()))
+        except (InvalidIdException,
+                CommandUnsupportedException,
+                CommandNotSupportedByDeviceException,
+                ValueError):
             response.success = False
         return response
 
@@ -265,7 +384,8 @@ def main(args=None):
 
     turntable_node = TurntableNode()
 
-    rclpy.spin(turntable_node)
+    executor = MultiThreadedExecutor()
+    rclpy.spin(turntable_node, executor=executor)
 
     turntable_node.destroy_node()
 